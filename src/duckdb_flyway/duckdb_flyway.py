@@ -1,13 +1,17 @@
+from __future__ import annotations
+
 import os
+import re
 import importlib.util
-from typing import Union, Callable, TypeAlias
+from typing import TYPE_CHECKING, Union, Callable, TypeAlias
 from os import PathLike
-from duckdb import DuckDBPyConnection
-from loguru import logger as default_logger
 from dataclasses import dataclass
 from logging import Logger
 
-MigrationFunction: TypeAlias = Callable[[DuckDBPyConnection], None]
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection
+
+MigrationFunction: TypeAlias = Callable[["DuckDBPyConnection"], None]
 
 
 @dataclass
@@ -31,72 +35,144 @@ class MigrationError(Exception):
     pass
 
 
+# Loaded migrations keyed by file path, with the file's mtime_ns when it was loaded,
+# so repeated discovery doesn't re-execute unchanged migration modules
+_MIGRATIONS_CACHE: dict[str, tuple[int, Migration]] = {}
+
+# Statement recording an applied migration, shared by the per-migration and atomic paths
+_INSERT_MIGRATION_SQL = "INSERT INTO schema_migrations (id) VALUES (?)"
+
+# Migration filenames, 'm<ID>.py' or 'm<ID>_<name>.py', capturing the ID
+_MIGRATION_FILENAME_RE = re.compile(r"m([^_]*).*\.py")
+
+
 class DuckDBFlyway:
     def __init__(
         self,
         con: DuckDBPyConnection,
         migrations_dir: Union[str, PathLike, None] = None,
-        logger: Logger = default_logger,
+        logger: Logger | None = None,
     ):
         """Initialize DuckDBFlyway.
 
         Args:
             con: DuckDB connection
             migrations_dir: Path to migrations directory
-            logger: Logger instance to use
+            logger: Logger instance to use, defaults to loguru's logger
         """
+        if logger is None:
+            # Imported lazily to keep `import duckdb_flyway` cheap
+            from loguru import logger
+
         self.con = con
         self.logger = logger
+        self._initialized = False
 
         if migrations_dir is None:
             raise ValueError("migrations_dir parameter is required - must specify path to migrations directory")
         self.migrations_dir = migrations_dir
 
-    def find_migrations(self) -> list[Migration]:
+    def find_migrations(self, skip_ids: set[str] | frozenset[str] = frozenset()) -> list[Migration]:
         """Load all migration files from the migrations directory.
 
-        Discovers Python files starting with 'm' and ending in '.py'.
-        Each file must export a 'migration' object of type Migration.
-        Files are loaded in alphabetical order by filename.
+        Discovers Python files named 'm<ID>.py' or 'm<ID>_<name>.py'.
+        Each file must export a 'migration' object of type Migration whose ID
+        matches the one in its filename.
+        Loaded files are cached and reused until they are modified.
+
+        Args:
+            skip_ids: Migration IDs to skip without loading their files, matched
+                against the ID in the filename
 
         Returns:
-            List of migration objects sorted by ID
+            List of migration objects in no particular order; run_migrations()
+            applies them sorted by ID
+
+        Raises:
+            MigrationError: If two files share an ID, or a file exports a
+                migration with a different ID than its filename
         """
+        # List all Python files in migrations directory
+        entries = []
+        filenames_by_id = {}
+        with os.scandir(self.migrations_dir) as it:
+            for entry in it:
+                match = _MIGRATION_FILENAME_RE.fullmatch(entry.name)
+                if match and entry.is_file():
+                    migration_id = match[1]
+                    if migration_id in filenames_by_id:
+                        message = (
+                            f"Migration files {filenames_by_id[migration_id]} and "
+                            f"{entry.name} share ID {migration_id}, all migration IDs must be unique"
+                        )
+                        self.logger.error(message)
+                        raise MigrationError(message)
+                    filenames_by_id[migration_id] = entry.name
+                    entries.append((entry, migration_id))
+
         migrations = []
 
-        # List all Python files in migrations directory
-        for filename in sorted(os.listdir(self.migrations_dir)):
-            if (
-                filename.startswith("m")
-                and filename.endswith(".py")
-                and not filename.startswith("__")
-            ):
-                filepath = os.path.join(self.migrations_dir, filename)
-
-                # Load the module
-                spec = importlib.util.spec_from_file_location(filename[:-3], filepath)
-                if spec and spec.loader:
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-
-                    # Get the migration object
-                    if hasattr(module, "migration"):
-                        migrations.append(module.migration)
-                    else:
-                        self.logger.warning(
-                            f"Migration file {filename} skipped: missing required 'migration' export"
+        for entry, migration_id in entries:
+            if migration_id in skip_ids:
+                continue
+
+            mtime_ns = entry.stat().st_mtime_ns
+            cached = _MIGRATIONS_CACHE.get(entry.path)
+            if cached is not None and cached[0] == mtime_ns:
+                # Loaded files were checked against their filename ID when cached
+                migrations.append(cached[1])
+                continue
+
+            # Load the module
+            spec = importlib.util.spec_from_file_location(entry.name[:-3], entry.path)
+            if spec and spec.loader:
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+
+                # Get the migration object
+                migration = getattr(module, "migration", None)
+                if migration is not None:
+                    # Skipping applied files relies on the filename ID, so it must match
+                    if migration.id != migration_id:
+                        message = (
+                            f"Migration file {entry.name} exports ID {migration.id}, "
+                            f"expected {migration_id} from its filename"
                         )
+                        self.logger.error(message)
+                        raise MigrationError(message)
+                    migrations.append(migration)
+                    _MIGRATIONS_CACHE[entry.path] = (mtime_ns, migration)
+                else:
+                    _MIGRATIONS_CACHE.pop(entry.path, None)
+                    self.logger.warning(
+                        f"Migration file {entry.name} skipped: missing required 'migration' export"
+                    )
 
         return migrations
 
     def init_schema_migrations(self) -> None:
         """Create the schema migrations tracking table if it doesn't exist"""
+        if self._initialized:
+            return
+
         self.con.execute("""
             CREATE TABLE IF NOT EXISTS schema_migrations (
-                id TEXT PRIMARY KEY,
-                applied_at TIMESTAMP DEFAULT now()
+                id TEXT PRIMARY KEY
             );
         """)
+        self._initialized = True
+
+    def get_applied_migrations_set(self) -> set[str]:
+        """Get the set of already applied migration IDs.
+
+        Returns:
+            Set of migration IDs that have been applied
+        """
+        # Aggregate into a single list value to avoid building a tuple per row
+        (ids,) = self.con.execute(
+            "SELECT coalesce(list(id), []) FROM schema_migrations"
+        ).fetchone()
+        return set(ids)
 
     def get_applied_migrations(self) -> list[str]:
         """Get list of already applied migration IDs.
@@ -104,12 +180,20 @@ class DuckDBFlyway:
         Returns:
             List of migration IDs that have been applied, sorted by ID
         """
-        return [
-            row[0]
-            for row in self.con.execute(
-                "SELECT id FROM schema_migrations ORDER BY id"
-            ).fetchall()
-        ]
+        return sorted(self.get_applied_migrations_set())
+
+    def _init_and_get_applied_migrations(self) -> set[str]:
+        """Create the tracking table if needed and get the applied migration IDs.
+
+        Raises:
+            MigrationError: If the tracking table can't be created or read
+        """
+        try:
+            self.init_schema_migrations()
+            return self.get_applied_migrations_set()
+        except Exception as e:
+            self.logger.error(f"Failed to read applied migrations: {str(e)}")
+            raise MigrationError(f"Failed to read applied migrations: {str(e)}") from e
 
     def validate_migration_order(self, migrations: list[Migration], applied: set[str]) -> None:
         """Ensure new migrations have higher IDs than applied ones.
@@ -125,14 +209,15 @@ class DuckDBFlyway:
             return
 
         max_applied = max(applied)
-        new_migrations = [m for m in migrations if m.id not in applied]
 
-        if any(m.id < max_applied for m in new_migrations):
-            raise MigrationError(
+        if any(m.id < max_applied for m in migrations if m.id not in applied):
+            message = (
                 f"Invalid migration order: found new migration(s) with ID lower than "
                 f"latest applied migration {max_applied}. All new migrations must have "
                 f"higher IDs than existing ones."
             )
+            self.logger.error(message)
+            raise MigrationError(message)
 
     def _apply_migration(self, migration: Migration) -> None:
         """Apply a single migration and record it"""
@@ -146,9 +231,7 @@ class DuckDBFlyway:
             migration.run(self.con)
 
             # Record migration as applied
-            self.con.execute(
-                "INSERT INTO schema_migrations (id) VALUES (?)", [migration.id]
-            )
+            self.con.execute(_INSERT_MIGRATION_SQL, [migration.id])
 
             # Commit the transaction
             self.con.commit()
@@ -160,33 +243,116 @@ class DuckDBFlyway:
             self.logger.error(f"Failed to apply migration {migration.id}: {str(e)}")
             raise MigrationError(f"Migration {migration.id} failed: {str(e)}") from e
 
-    def run_migrations(self, migrations: list[Migration]) -> None:
-        """Run all pending migrations in order"""
-        try:
-            self.init_schema_migrations()
+    def _apply_migrations_atomic(self, migrations: list[Migration]) -> None:
+        """Apply migrations in order and record them, all in a single transaction.
 
-            # Get already applied migrations
-            applied = set(self.get_applied_migrations())
+        Args:
+            migrations: Pending migrations, in the order they should be applied
 
-            # Validate migration order
-            self.validate_migration_order(migrations, applied)
+        Raises:
+            MigrationError: If a migration fails to apply, after rolling back all of them
+        """
+        if not migrations:
+            return
 
-            # Apply each migration in its own transaction
-            for migration in sorted(migrations, key=lambda m: m.id):
-                if migration.id not in applied:
-                    self._apply_migration(migration)
+        try:
+            self.con.begin()
+        except Exception as e:
+            # Nothing of ours to roll back, the transaction never started
+            self.logger.error(f"Failed to start migrations transaction: {str(e)}")
+            raise MigrationError(f"Failed to start migrations transaction: {str(e)}") from e
+
+        for migration in migrations:
+            self.logger.info(f"Applying migration {migration.id}")
+
+            try:
+                migration.run(self.con)
+            except Exception as e:
+                self.con.rollback()
+                self.logger.error(f"Failed to apply migration {migration.id}: {str(e)}")
+                raise MigrationError(
+                    f"Migration {migration.id} failed, rolled back all pending migrations: {str(e)}"
+                ) from e
 
+        try:
+            self.con.executemany(
+                _INSERT_MIGRATION_SQL,
+                [(migration.id,) for migration in migrations],
+            )
+            self.con.commit()
         except Exception as e:
-            self.logger.error(f"Migration failed: {str(e)}")
-            raise MigrationError(f"Failed to run migrations: {str(e)}") from e
+            self.con.rollback()
+            self.logger.error(f"Failed to record migrations: {str(e)}")
+            raise MigrationError(f"Recording migrations failed: {str(e)}") from e
+
+        for migration in migrations:
+            self.logger.info(f"Successfully applied migration {migration.id}")
 
-    def find_and_run_migrations(self) -> None:
+    def run_migrations(self, migrations: list[Migration], atomic: bool = False) -> None:
+        """Run all pending migrations in order.
+
+        Args:
+            migrations: List of all migrations, applied ones are skipped
+            atomic: Run all pending migrations in a single transaction, committing
+                once at the end. A failure rolls back every pending migration, not
+                just the failing one, and some statements may not be allowed to
+                share a transaction
+
+        Raises:
+            MigrationError: If any migration fails to apply
+        """
+        # Get already applied migrations
+        applied = self._init_and_get_applied_migrations()
+        self._run_pending_migrations(migrations, applied, atomic)
+
+    def _run_pending_migrations(
+        self, migrations: list[Migration], applied: set[str], atomic: bool
+    ) -> None:
+        """Validate and apply the migrations that aren't in the applied set.
+
+        Args:
+            migrations: Migrations to consider, applied ones are skipped
+            applied: Set of already applied migration IDs
+            atomic: Run all pending migrations in a single transaction
+
+        Raises:
+            MigrationError: If any migration fails to apply
+        """
+        # Validate migration order
+        self.validate_migration_order(migrations, applied)
+
+        migrations_by_id = {migration.id: migration for migration in migrations}
+        if len(migrations_by_id) != len(migrations):
+            message = "Duplicate migration IDs found, all migration IDs must be unique"
+            self.logger.error(message)
+            raise MigrationError(message)
+
+        # Only sort the pending migrations, usually far fewer than all of them
+        pending = [
+            migrations_by_id[migration_id]
+            for migration_id in sorted(migrations_by_id.keys() - applied)
+        ]
+
+        # Failures are logged and wrapped in MigrationError by the apply helpers
+        if atomic:
+            self._apply_migrations_atomic(pending)
+        else:
+            # Apply each migration in its own transaction
+            for migration in pending:
+                self._apply_migration(migration)
+
+    def find_and_run_migrations(self, atomic: bool = False) -> None:
         """Find and run all pending migrations.
         
         Convenience method that combines find_migrations() and run_migrations().
+        Files of already applied migrations are not loaded.
+
+        Args:
+            atomic: Run all pending migrations in a single transaction, see run_migrations()
         
         Raises:
             MigrationError: If any migration fails to apply
         """
-        migrations = self.find_migrations()
-        self.run_migrations(migrations)
+        applied = self._init_and_get_applied_migrations()
+        migrations = self.find_migrations(skip_ids=applied)
+        self._run_pending_migrations(migrations, applied, atomic)
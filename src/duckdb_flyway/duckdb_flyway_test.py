@@ -1,3 +1,7 @@
+import os
+import subprocess
+import sys
+
 import duckdb
 import pytest
 from duckdb import DuckDBPyConnection
@@ -90,7 +94,7 @@ def test_init_schema_migrations(flyway: DuckDBFlyway) -> None:
 
     Verifies that:
     - The schema_migrations table is created
-    - The table has the correct columns and types
+    - The table only has the id column
     """
     flyway.init_schema_migrations()
 
@@ -102,9 +106,17 @@ def test_init_schema_migrations(flyway: DuckDBFlyway) -> None:
         ORDER BY column_name;
     """).fetchall()
 
-    assert len(result) == 2
-    assert result[0][0] == "applied_at"
-    assert result[1][0] == "id"
+    assert result == [("id", "VARCHAR")]
+
+
+def test_init_schema_migrations_once(flyway: DuckDBFlyway, mocker) -> None:
+    """Test that the tracking table DDL only runs on the first call"""
+    flyway.con = mocker.Mock()
+
+    flyway.init_schema_migrations()
+    flyway.init_schema_migrations()
+
+    flyway.con.execute.assert_called_once()
 
 
 def test_get_applied_migrations_empty(flyway: DuckDBFlyway) -> None:
@@ -128,6 +140,19 @@ def test_get_applied_migrations(flyway: DuckDBFlyway) -> None:
     assert applied == ["20240320000000", "20240320000001"]
 
 
+def test_get_applied_migrations_set(flyway: DuckDBFlyway) -> None:
+    """Test getting applied migrations as a set."""
+    flyway.init_schema_migrations()
+    assert flyway.get_applied_migrations_set() == set()
+
+    flyway.con.execute(
+        "INSERT INTO schema_migrations (id) VALUES (?), (?)",
+        ["20240320000001", "20240320000000"],
+    )
+
+    assert flyway.get_applied_migrations_set() == {"20240320000000", "20240320000001"}
+
+
 def test_validate_migration_order_valid(flyway: DuckDBFlyway) -> None:
     """Test validation passes for correctly ordered migrations"""
     applied = {"20240320000000", "20240320000001"}
@@ -156,6 +181,18 @@ def test_validate_migration_order_invalid(flyway: DuckDBFlyway) -> None:
     )
 
 
+def test_run_migrations_invalid_order_logged(flyway, mocker) -> None:
+    """Test that an order violation in run_migrations is logged once"""
+    flyway.logger = mocker.Mock()
+    flyway.run_migrations([create_test_migration("20240320000002")])
+
+    with pytest.raises(MigrationError):
+        flyway.run_migrations([create_test_migration("20240320000001")])
+
+    flyway.logger.error.assert_called_once()
+    assert "Invalid migration order" in flyway.logger.error.call_args[0][0]
+
+
 def test_apply_migration_creates_table_and_records_success(flyway, mocker) -> None:
     """Test successful migration application.
 
@@ -276,6 +313,21 @@ migration = Migration("20240320000001", run)
     assert flyway.get_applied_migrations() == ["20240320000001"]
 
 
+def test_find_and_run_migrations_reads_applied_once(flyway, tmp_path, mocker) -> None:
+    """Test that find_and_run_migrations only queries applied migrations once"""
+    (tmp_path / "migrations" / "m20240320000001_test.py").write_text("""
+from duckdb_flyway import Migration
+
+migration = Migration("20240320000001", lambda con: None)
+""")
+    get_applied = mocker.spy(flyway, "get_applied_migrations_set")
+
+    flyway.find_and_run_migrations()
+
+    get_applied.assert_called_once()
+    assert flyway.get_applied_migrations() == ["20240320000001"]
+
+
 def test_run_migrations_failure(flyway) -> None:
     """Test that migrations are applied one by one and stop at failure"""
     # Create test migrations with one that fails
@@ -310,6 +362,260 @@ def test_run_migrations_failure(flyway) -> None:
     assert tables[0][0] == "test1"
 
 
+def test_find_migrations_cached(flyway, tmp_path) -> None:
+    """Test that unchanged migration files are not reloaded on repeated discovery"""
+    migration_file = tmp_path / "migrations" / "m20240320000001_test.py"
+    migration_file.write_text("""
+from duckdb_flyway import Migration
+
+migration = Migration("20240320000001", lambda con: None)
+""")
+
+    first = flyway.find_migrations()
+    second = flyway.find_migrations()
+    assert [m.id for m in first] == ["20240320000001"]
+    assert first[0] is second[0]
+
+    # Adding a file invalidates the cache
+    (tmp_path / "migrations" / "m20240320000002_test.py").write_text("""
+from duckdb_flyway import Migration
+
+migration = Migration("20240320000002", lambda con: None)
+""")
+    third = flyway.find_migrations()
+    assert sorted(m.id for m in third) == ["20240320000001", "20240320000002"]
+
+    # Modifying a file reloads it in place of the cached entry
+    migration_file.write_text("""
+from duckdb_flyway import Migration
+
+migration = Migration("20240320000001", lambda con: None)
+RELOADED = True
+""")
+    os.utime(migration_file, ns=(0, 0))
+    fourth = flyway.find_migrations()
+    assert sorted(m.id for m in fourth) == ["20240320000001", "20240320000002"]
+    assert first[0] not in fourth
+
+
+def test_find_migrations_module_error(flyway, tmp_path) -> None:
+    """Test that errors raised by a migration file's body are not swallowed"""
+    (tmp_path / "migrations" / "m20240320000001_broken.py").write_text("""
+import os
+from duckdb_flyway import Migration
+
+X = os.nonexistent_attr
+
+migration = Migration("20240320000001", lambda con: None)
+""")
+
+    with pytest.raises(AttributeError):
+        flyway.find_migrations()
+
+
+def test_find_migrations_missing_export(flyway, tmp_path, mocker) -> None:
+    """Test that files without a 'migration' export are skipped with a warning"""
+    flyway.logger = mocker.Mock()
+    (tmp_path / "migrations" / "m20240320000001_empty.py").write_text("X = 1\n")
+
+    assert flyway.find_migrations() == []
+    assert flyway.find_migrations() == []
+
+    # Warned on every discovery, not only the first
+    assert flyway.logger.warning.call_count == 2
+    flyway.logger.warning.assert_called_with(
+        "Migration file m20240320000001_empty.py skipped: missing required 'migration' export"
+    )
+
+
+def test_find_migrations_skip_ids(flyway, tmp_path) -> None:
+    """Test that files of skipped migration IDs are never loaded"""
+    (tmp_path / "migrations" / "m20240320000001_old.py").write_text(
+        "raise RuntimeError('should not be loaded')\n"
+    )
+    (tmp_path / "migrations" / "m20240320000002_new.py").write_text("""
+from duckdb_flyway import Migration
+
+migration = Migration("20240320000002", lambda con: None)
+""")
+
+    migrations = flyway.find_migrations(skip_ids={"20240320000001"})
+    assert [m.id for m in migrations] == ["20240320000002"]
+
+
+def test_find_migrations_filename_id_mismatch(flyway, tmp_path) -> None:
+    """Test that a file exporting a different ID than its filename is rejected"""
+    (tmp_path / "migrations" / "m20240320000001_test.py").write_text("""
+from duckdb_flyway import Migration
+
+migration = Migration("20240320000002", lambda con: None)
+""")
+
+    with pytest.raises(MigrationError) as exc_info:
+        flyway.find_migrations()
+    assert "exports ID 20240320000002, expected 20240320000001" in str(exc_info.value)
+
+
+def test_find_and_run_migrations_duplicate_filename_ids(flyway, tmp_path) -> None:
+    """Test that a new file reusing an applied file's ID is rejected, not skipped"""
+    (tmp_path / "migrations" / "m20240320000001_a.py").write_text("""
+from duckdb_flyway import Migration
+
+migration = Migration("20240320000001", lambda con: None)
+""")
+    flyway.find_and_run_migrations()
+
+    (tmp_path / "migrations" / "m20240320000001_b.py").write_text("""
+from duckdb_flyway import Migration
+
+migration = Migration("20240320000002", lambda con: None)
+""")
+
+    with pytest.raises(MigrationError) as exc_info:
+        flyway.find_and_run_migrations()
+    assert "share ID 20240320000001" in str(exc_info.value)
+    assert flyway.get_applied_migrations() == ["20240320000001"]
+
+
+def test_import_does_not_load_dependencies() -> None:
+    """Test that importing the package doesn't pull in duckdb or loguru"""
+    code = (
+        "import sys, duckdb_flyway; "
+        "from duckdb_flyway import DuckDBFlyway, Migration, MigrationError; "
+        "assert 'duckdb' not in sys.modules; "
+        "assert 'loguru' not in sys.modules"
+    )
+    # Pass on sys.path so the package resolves without an installed copy
+    subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+
+def test_run_migrations_records_each_migration_with_its_changes(flyway) -> None:
+    """Test that a migration's record is committed together with its changes.
+
+    The second migration checks from a separate cursor that the first one is
+    already committed and recorded before it starts.
+    """
+    seen = []
+
+    def check_first_recorded(con: DuckDBPyConnection) -> None:
+        seen.extend(
+            row[0]
+            for row in flyway.con.cursor()
+            .execute("SELECT id FROM schema_migrations")
+            .fetchall()
+        )
+
+    migrations = [
+        create_test_migration("20240320000001", "CREATE TABLE test1 (id INTEGER)"),
+        Migration("20240320000002", check_first_recorded),
+    ]
+
+    flyway.run_migrations(migrations)
+
+    assert seen == ["20240320000001"]
+
+
+def test_run_migrations_failure_logged_once(flyway, mocker) -> None:
+    """Test that a failing migration is logged once and its error propagates as is"""
+    custom_logger = mocker.Mock()
+    flyway = DuckDBFlyway(
+        flyway.con, migrations_dir=flyway.migrations_dir, logger=custom_logger
+    )
+
+    with pytest.raises(MigrationError) as exc_info:
+        flyway.run_migrations([Migration("20240320000001", lambda _: raise_exception())])
+    assert str(exc_info.value) == "Migration 20240320000001 failed: Migration failed"
+
+    custom_logger.error.assert_called_once_with(
+        "Failed to apply migration 20240320000001: Migration failed"
+    )
+
+
+def test_run_migrations_duplicate_ids(flyway, mocker) -> None:
+    """Test that migrations sharing an ID are rejected before anything runs"""
+    flyway.logger = mocker.Mock()
+    migrations = [
+        create_test_migration("20240320000001", "CREATE TABLE test1 (id INTEGER)"),
+        create_test_migration("20240320000001", "CREATE TABLE test2 (id INTEGER)"),
+    ]
+
+    with pytest.raises(MigrationError) as exc_info:
+        flyway.run_migrations(migrations)
+    assert "Duplicate migration IDs" in str(exc_info.value)
+    assert not table_exists(flyway.con, "test1")
+    flyway.logger.error.assert_called_once_with(
+        "Duplicate migration IDs found, all migration IDs must be unique"
+    )
+
+
+def test_run_migrations_atomic_success(flyway) -> None:
+    """Test running multiple migrations in a single transaction"""
+    migrations = [
+        create_test_migration("20240320000001", "CREATE TABLE test1 (id INTEGER)"),
+        create_test_migration("20240320000002", "CREATE TABLE test2 (id INTEGER)"),
+    ]
+
+    flyway.run_migrations(migrations, atomic=True)
+
+    assert flyway.get_applied_migrations() == ["20240320000001", "20240320000002"]
+    assert table_exists(flyway.con, "test1")
+    assert table_exists(flyway.con, "test2")
+
+
+def test_run_migrations_atomic_failure(flyway) -> None:
+    """Test that a failing migration rolls back all pending migrations in atomic mode"""
+    migrations = [
+        create_test_migration("20240320000001", "CREATE TABLE test1 (id INTEGER)"),
+        Migration("20240320000002", lambda _: raise_exception()),
+    ]
+
+    with pytest.raises(MigrationError) as exc_info:
+        flyway.run_migrations(migrations, atomic=True)
+    assert "Migration 20240320000002 failed" in str(exc_info.value)
+
+    assert flyway.get_applied_migrations() == []
+    assert not table_exists(flyway.con, "test1")
+
+
+def test_run_migrations_atomic_begin_failure(flyway) -> None:
+    """Test that failing to start the atomic transaction raises MigrationError"""
+    flyway.init_schema_migrations()
+    flyway.con.begin()
+
+    with pytest.raises(MigrationError) as exc_info:
+        flyway.run_migrations(
+            [create_test_migration("20240320000001", "CREATE TABLE test1 (id INTEGER)")],
+            atomic=True,
+        )
+    assert "Failed to start migrations transaction" in str(exc_info.value)
+
+    flyway.con.rollback()
+    assert flyway.get_applied_migrations() == []
+
+
+def test_find_and_run_migrations_atomic(flyway, tmp_path) -> None:
+    """Test running migration files in a single transaction"""
+    for i in (1, 2):
+        (tmp_path / "migrations" / f"m2024032000000{i}_test.py").write_text(f"""
+from duckdb_flyway import Migration
+
+def run(con):
+    con.execute("CREATE TABLE test{i} (id INTEGER);")
+
+migration = Migration("2024032000000{i}", run)
+""")
+
+    flyway.find_and_run_migrations(atomic=True)
+
+    assert flyway.get_applied_migrations() == ["20240320000001", "20240320000002"]
+    assert table_exists(flyway.con, "test1")
+    assert table_exists(flyway.con, "test2")
+
+
 def raise_exception() -> None:
     """Helper function to raise an exception for testing error scenarios.
 